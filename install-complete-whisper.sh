@@ -544,7 +544,7 @@ install_faster_whisper() {
     pip install faster-whisper
     
     # Audio processing dependencies
-    pip install librosa soundfile audioread
+    pip install librosa soundfile soxr audioread
     
     # Optimization libraries
     pip install numpy scipy
@@ -599,7 +599,7 @@ install_insanely_fast_whisper() {
     pip install optimum
     
     # Audio processing dependencies (if not already installed)
-    pip install librosa soundfile
+    pip install librosa soundfile soxr
     
     # Additional optimization packages
     if [[ "$CUDA_AVAILABLE" == "true" ]]; then
@@ -636,8 +636,8 @@ install_additional_python_deps() {
     
     print_status "Installing additional utilities..."
     
-    # JSON and data handling
-    pip install jsonschema
+    # JSON and data handling (orjson speeds up bridge output serialization)
+    pip install jsonschema orjson
     
     # Audio format support
     pip install pydub
@@ -683,7 +683,7 @@ WORKER_TIMEOUT=300000
 
 # Faster-Whisper Configuration
 FASTER_WHISPER_DEVICE=cpu
-FASTER_WHISPER_COMPUTE_TYPE=int8
+FASTER_WHISPER_COMPUTE_TYPE=auto
 
 # Insanely-Fast-Whisper Configuration
 INSANELY_FAST_WHISPER_DEVICE=auto
@@ -704,9 +704,9 @@ EOF
         fi
         
         if grep -q "FASTER_WHISPER_COMPUTE_TYPE=" "$ENV_FILE"; then
-            sed -i 's/FASTER_WHISPER_COMPUTE_TYPE=.*/FASTER_WHISPER_COMPUTE_TYPE=float16/' "$ENV_FILE"
+            sed -i 's/FASTER_WHISPER_COMPUTE_TYPE=.*/FASTER_WHISPER_COMPUTE_TYPE=auto/' "$ENV_FILE"
         else
-            echo "FASTER_WHISPER_COMPUTE_TYPE=float16" >> "$ENV_FILE"
+            echo "FASTER_WHISPER_COMPUTE_TYPE=auto" >> "$ENV_FILE"
         fi
         
         # Update insanely-fast-whisper for CUDA
@@ -794,18 +794,21 @@ run_tests() {
     
     print_status "Testing Python bridges..."
     
+    # The bridges import their dependencies lazily, so check the imports
+    # directly rather than running --help
+
     # Test faster-whisper bridge
-    if python3 scripts/faster_whisper_bridge.py --help &> /dev/null; then
-        print_success "faster-whisper bridge is working"
+    if python3 -c "import faster_whisper" &> /dev/null; then
+        print_success "faster-whisper bridge dependencies are installed"
     else
-        print_warning "faster-whisper bridge test failed"
+        print_warning "faster-whisper bridge dependencies are missing"
     fi
     
     # Test insanely-fast-whisper bridge  
-    if python3 scripts/insanely_fast_whisper_bridge.py --help &> /dev/null; then
-        print_success "insanely-fast-whisper bridge is working"
+    if python3 -c "import torch, transformers, soundfile, soxr, numpy" &> /dev/null; then
+        print_success "insanely-fast-whisper bridge dependencies are installed"
     else
-        print_warning "insanely-fast-whisper bridge test failed"
+        print_warning "insanely-fast-whisper bridge dependencies are missing"
     fi
     
     print_status "Testing engine validation..."
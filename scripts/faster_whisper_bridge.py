@@ -2,24 +2,197 @@
 """
 Faster-Whisper Bridge for WhisperAPI
 Provides a Python interface for faster-whisper transcription
+
+By default the bridge runs as a long-lived worker: it reads newline-delimited
+JSON requests from stdin and writes one JSON result per line to stdout, keeping
+loaded models in memory between jobs. Use --oneshot for a single transcription.
 """
 
 import sys
 import json
 import argparse
 import os
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 try:
-    from faster_whisper import WhisperModel
+    import orjson
+
+    def dumps(obj, indent=False):
+        """Serialize obj to a JSON string (orjson when available)"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode()
 except ImportError:
-    print(json.dumps({
-        "error": "faster-whisper not installed. Run: pip install faster-whisper"
-    }))
-    sys.exit(1)
+    def dumps(obj, indent=False):
+        """Serialize obj to a JSON string (orjson when available)"""
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+# faster-whisper is imported on first use so --help and argument errors stay fast
+WhisperModel = None
+decode_audio = None
+_IMPORTS_DONE = False
+
+def import_dependencies():
+    """
+    Import faster-whisper into module globals once
+
+    Raises:
+        ImportError: If faster-whisper is not installed
+    """
+    global WhisperModel, decode_audio, _IMPORTS_DONE
+    if _IMPORTS_DONE:
+        return
+
+    try:
+        from faster_whisper import WhisperModel, decode_audio
+    except ImportError as e:
+        raise ImportError("faster-whisper not installed. Run: pip install faster-whisper") from e
+    _IMPORTS_DONE = True
+
+VAD_CHOICES = ("auto", "on", "off")
+
+# In 'auto' mode, clips up to this length are assumed to be pre-segmented and skip VAD
+VAD_AUTO_MIN_DURATION_S = 10.0
+
+# Half the logical cores: one thread per physical core avoids SMT oversubscription
+DEFAULT_CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)
+
+# Loaded models keyed by (model_path, device, compute_type, cpu_threads), least recently used first
+_MODEL_CACHE = OrderedDict()
+_MODEL_CACHE_SIZE = 2
+
+def resolve_compute_type(compute_type, device):
+    """
+    Map the requested compute type to the CTranslate2 type used on this device
+
+    'auto' and 'int8' select int8_float16 on CUDA (int8 weights with float16
+    activations, which runs on the GPU tensor cores) and int8 everywhere else.
+    Any other CTranslate2 type (int8_bfloat16, int16, float16, bfloat16,
+    float32) is passed through unchanged; the bfloat16 variants need a CUDA
+    GPU with compute capability 8.0 or newer.
+    """
+    if compute_type in ("auto", "int8"):
+        return "int8_float16" if device == "cuda" else "int8"
+    return compute_type
+
+def get_model(model_path, device="cpu", compute_type="int8", cpu_threads=None):
+    """
+    Return a cached WhisperModel, loading it on first use
+
+    Evicts the least recently used model once the cache holds more than
+    _MODEL_CACHE_SIZE entries.
+    """
+    cpu_threads = cpu_threads or DEFAULT_CPU_THREADS
+    key = (model_path, device, compute_type, cpu_threads)
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        _MODEL_CACHE.move_to_end(key)
+        return model
 
-def transcribe_audio(model_path, audio_path, device="cpu", compute_type="int8", 
-                    language=None, translate=False):
+    model = WhisperModel(model_path, device=device, compute_type=compute_type,
+                         cpu_threads=cpu_threads, num_workers=1)
+    _MODEL_CACHE[key] = model
+    while len(_MODEL_CACHE) > _MODEL_CACHE_SIZE:
+        _MODEL_CACHE.popitem(last=False)
+    return model
+
+def should_use_vad(audio_path, vad="auto", duration=None):
+    """
+    Decide whether to run Silero VAD before transcription
+
+    'on' and 'off' are honoured as given. 'auto' skips VAD for clips no longer
+    than VAD_AUTO_MIN_DURATION_S, and keeps it when the duration is unknown.
+    duration (seconds) is read from the file header when not given.
+    """
+    if vad != "auto":
+        return vad == "on"
+
+    if duration is None:
+        try:
+            import soundfile as sf
+            duration = sf.info(audio_path).duration
+        except Exception:
+            return True
+    return duration > VAD_AUTO_MIN_DURATION_S
+
+def load_audio(audio_path, sample_rate=16000):
+    """
+    Load audio as mono float32 samples at sample_rate through libsndfile
+
+    Returns None when soundfile/soxr are missing or libsndfile cannot decode
+    the file, so the caller can fall back to faster-whisper's ffmpeg decoder.
+    """
+    try:
+        import soundfile as sf
+        audio, sr = sf.read(audio_path, dtype='float32')
+        if audio.ndim == 2:
+            audio = audio.mean(axis=1)
+        if sr != sample_rate:
+            import soxr
+            audio = soxr.resample(audio, sr, sample_rate)
+    except Exception:
+        return None
+    return audio
+
+def segment_words(segment):
+    """
+    Return the word-level timestamps of a segment as plain dicts
+    """
+    # Segment.words is always present and None when word timestamps are disabled
+    if not segment.words:
+        return []
+    return [
+        {
+            "word": word.word,
+            "start": word.start,
+            "end": word.end,
+            "probability": word.probability
+        }
+        for word in segment.words
+    ]
+
+def start_transcription(model_path, audio_path, device="cpu", compute_type="auto",
+                        language=None, translate=False, vad="auto", min_silence_duration_ms=500,
+                        batch_size=1, cpu_threads=None, word_timestamps=False, audio=None):
+    """
+    Start a faster-whisper transcription
+
+    Returns:
+        tuple: (lazy segment generator, TranscriptionInfo)
+    """
+    # Reuse the model if it was already loaded by a previous job
+    resolved = resolve_compute_type(compute_type, device)
+    model = get_model(model_path, device=device, compute_type=resolved, cpu_threads=cpu_threads)
+
+    transcribe_kwargs = {}
+    if batch_size > 1:
+        # Decode the segments of a file as batches (faster-whisper >= 1.1)
+        from faster_whisper import BatchedInferencePipeline
+        model = BatchedInferencePipeline(model=model)
+        transcribe_kwargs["batch_size"] = batch_size
+
+    # Decoded samples skip the ffmpeg subprocess faster-whisper spawns for a path
+    if audio is None:
+        audio = load_audio(audio_path)
+    duration = len(audio) / 16000 if audio is not None else None
+
+    return model.transcribe(
+        audio if audio is not None else audio_path,
+        language=language if language != 'auto' else None,
+        task="translate" if translate else "transcribe",
+        word_timestamps=word_timestamps,
+        vad_filter=should_use_vad(audio_path, vad, duration=duration),
+        vad_parameters=dict(min_silence_duration_ms=min_silence_duration_ms),
+        **transcribe_kwargs
+    )
+
+def transcribe_audio(model_path, audio_path, device="cpu", compute_type="auto", 
+                    language=None, translate=False, vad="auto", min_silence_duration_ms=500,
+                    batch_size=1, cpu_threads=None, word_timestamps=False, audio=None):
     """
     Transcribe audio using faster-whisper
     
@@ -27,44 +200,40 @@ def transcribe_audio(model_path, audio_path, device="cpu", compute_type="int8",
         model_path: Model name or path (e.g., 'large-v3', 'medium')
         audio_path: Path to audio file
         device: 'cpu' or 'cuda'
-        compute_type: 'int8', 'int16', 'float16', 'float32'
+        compute_type: 'auto' or a CTranslate2 type ('int8', 'int8_float16',
+            'int8_bfloat16', 'int16', 'float16', 'bfloat16', 'float32')
         language: Language code (e.g., 'pt', 'en') or None for auto-detection
         translate: Whether to translate to English
+        vad: 'auto', 'on' or 'off' (see should_use_vad)
+        min_silence_duration_ms: Minimum silence for VAD to split speech
+        batch_size: Segments decoded per batch; above 1 uses BatchedInferencePipeline
+        cpu_threads: CTranslate2 CPU threads (default: half the logical cores)
+        word_timestamps: Align word-level timestamps; 'words' is empty otherwise
+        audio: Pre-decoded 16 kHz mono samples, loaded from audio_path when None
     
     Returns:
         dict: Transcription result with text and metadata
     """
     try:
-        # Initialize the model
-        model = WhisperModel(model_path, device=device, compute_type=compute_type)
-        
-        # Transcribe the audio
-        segments, info = model.transcribe(
-            audio_path,
-            language=language if language != 'auto' else None,
-            task="translate" if translate else "transcribe",
-            word_timestamps=True,
-            vad_filter=True,
-            vad_parameters=dict(min_silence_duration_ms=500)
+        import_dependencies()
+        segments, info = start_transcription(
+            model_path, audio_path, device=device, compute_type=compute_type,
+            language=language, translate=translate, vad=vad,
+            min_silence_duration_ms=min_silence_duration_ms,
+            batch_size=batch_size, cpu_threads=cpu_threads,
+            word_timestamps=word_timestamps, audio=audio
         )
         
         # Extract text and word-level timestamps
-        full_text = ""
+        parts = []
         words = []
         
         for segment in segments:
-            full_text += segment.text + " "
-            if hasattr(segment, 'words') and segment.words:
-                for word in segment.words:
-                    words.append({
-                        "word": word.word,
-                        "start": word.start,
-                        "end": word.end,
-                        "probability": word.probability
-                    })
+            parts.append(segment.text)
+            words.extend(segment_words(segment))
         
         return {
-            "text": full_text.strip(),
+            "text": " ".join(part.strip() for part in parts),
             "language": info.language,
             "language_probability": info.language_probability,
             "duration": info.duration,
@@ -74,34 +243,274 @@ def transcribe_audio(model_path, audio_path, device="cpu", compute_type="int8",
     except Exception as e:
         return {"error": str(e)}
 
+def stream_audio(model_path, audio_path, request_id=None, **kwargs):
+    """
+    Transcribe audio writing NDJSON to stdout as segments are decoded
+
+    Emits one {"segment": {...}} line per segment followed by a final
+    {"summary": {...}} line, or a single {"error": ...} line on failure.
+    Accepts the same keyword arguments as transcribe_audio.
+    """
+    def emit(payload):
+        if request_id is not None:
+            payload["id"] = request_id
+        sys.stdout.write(dumps(payload) + "\n")
+        sys.stdout.flush()
+
+    try:
+        import_dependencies()
+        segments, info = start_transcription(model_path, audio_path, **kwargs)
+
+        for segment in segments:
+            emit({"segment": {
+                "text": segment.text,
+                "start": segment.start,
+                "end": segment.end,
+                "words": segment_words(segment)
+            }})
+
+        emit({"summary": {
+            "language": info.language,
+            "language_probability": info.language_probability,
+            "duration": info.duration
+        }})
+
+    except Exception as e:
+        emit({"error": str(e)})
+
+def transcribe_many(audio_paths, **kwargs):
+    """
+    Transcribe several files, decoding the next file while the current one runs
+
+    Accepts the same keyword arguments as transcribe_audio.
+
+    Returns:
+        dict: Transcription result (or error) keyed by audio path
+    """
+    def decode(path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Audio file not found: {path}")
+        audio = load_audio(path)
+        return audio if audio is not None else decode_audio(path, sampling_rate=16000)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(decode, audio_paths[0])
+        for index, path in enumerate(audio_paths):
+            try:
+                audio = pending.result()
+            except Exception as e:
+                audio = e
+            if index + 1 < len(audio_paths):
+                pending = executor.submit(decode, audio_paths[index + 1])
+
+            if isinstance(audio, Exception):
+                results[path] = {"error": str(audio)}
+            else:
+                results[path] = transcribe_audio(audio_path=path, audio=audio, **kwargs)
+    return results
+
+# Transcription options of a pool worker process, set by _init_pool_worker
+_POOL_OPTIONS = None
+
+def _init_pool_worker(options):
+    """
+    Store the transcription options in a pool worker process
+
+    The model is loaded on the first _pool_transcribe call instead of here: an
+    exception in a Pool initializer makes multiprocessing respawn the worker
+    forever, while transcribe_audio turns load failures into per-file errors.
+    """
+    global _POOL_OPTIONS
+    _POOL_OPTIONS = options
+
+def _pool_transcribe(audio_path):
+    if not os.path.exists(audio_path):
+        return audio_path, {"error": f"Audio file not found: {audio_path}"}
+    return audio_path, transcribe_audio(audio_path=audio_path, **_POOL_OPTIONS)
+
+def transcribe_parallel(audio_paths, workers, **kwargs):
+    """
+    Transcribe several files on CPU across worker processes
+
+    Each process holds its own model with kwargs["cpu_threads"] threads.
+    Accepts the same keyword arguments as transcribe_audio.
+
+    Returns:
+        dict: Transcription result (or error) keyed by audio path
+    """
+    # spawn avoids forking a parent that has already loaded the OpenMP runtime
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_pool_worker, initargs=(kwargs,)) as pool:
+        return dict(pool.imap(_pool_transcribe, audio_paths))
+
+def handle_request(request, defaults):
+    """Answer a single serve-mode request with one or more JSON lines"""
+    audio_path = request.get("audio")
+    options = dict(
+        model_path=request.get("model", defaults.model),
+        audio_path=audio_path,
+        device=request.get("device", defaults.device),
+        compute_type=request.get("compute_type", defaults.compute_type),
+        language=request.get("language", defaults.language),
+        translate=request.get("translate", defaults.translate),
+        vad=request.get("vad", defaults.vad),
+        min_silence_duration_ms=request.get("min_silence_duration_ms", defaults.min_silence_duration_ms),
+        batch_size=request.get("batch_size", defaults.batch_size),
+        cpu_threads=request.get("cpu_threads", defaults.cpu_threads),
+        word_timestamps=request.get("word_timestamps", defaults.word_timestamps)
+    )
+
+    if not isinstance(audio_path, str) or not audio_path:
+        result = {"error": "Invalid request: \"audio\" must be a non-empty string"}
+    elif not os.path.exists(audio_path):
+        result = {"error": f"Audio file not found: {audio_path}"}
+    elif request.get("stream", defaults.stream):
+        stream_audio(request_id=request.get("id"), **options)
+        return
+    else:
+        result = transcribe_audio(**options)
+
+    if "id" in request:
+        result["id"] = request["id"]
+
+    print(dumps(result), flush=True)
+
+def serve_loop(defaults):
+    """
+    Process newline-delimited JSON requests from stdin until EOF
+
+    Each request must contain "audio" and may override "model", "device",
+    "compute_type", "language", "translate", "vad",
+    "min_silence_duration_ms", "batch_size", "cpu_threads" and
+    "word_timestamps". An optional "id" is echoed
+    back so the caller can match responses to requests. Requests with
+    "stream": true are answered with NDJSON segment lines (see stream_audio).
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(json.dumps({"error": f"Invalid request: {e}"}), flush=True)
+            continue
+
+        if not isinstance(request, dict):
+            print(json.dumps({"error": "Invalid request: expected a JSON object"}), flush=True)
+            continue
+
+        try:
+            handle_request(request, defaults)
+        except Exception as e:
+            # The stdlib encoder takes any id json.loads produced, unlike orjson
+            error = {"error": f"Request failed: {e}"}
+            if "id" in request:
+                error["id"] = request["id"]
+            print(json.dumps(error), flush=True)
+
 def main():
     parser = argparse.ArgumentParser(description='Faster-Whisper Bridge')
     parser.add_argument('--model', required=True, help='Model name or path')
-    parser.add_argument('--audio', required=True, help='Audio file path')
+    parser.add_argument('--audio', action='append',
+                        help='Audio file path (requires --oneshot). Repeat to transcribe several files; '
+                             'the result is then a JSON object keyed by path')
     parser.add_argument('--device', default='cpu', help='Device: cpu or cuda')
-    parser.add_argument('--compute_type', default='int8', help='Compute type')
+    parser.add_argument('--compute_type', default='auto',
+                        help='Compute type: auto, int8, int8_float16, int8_bfloat16, int16, '
+                             'float16, bfloat16 or float32. auto and int8 use int8_float16 '
+                             'on cuda and int8 on cpu; the bfloat16 types are cuda-only')
+    parser.add_argument('--cpu_threads', type=int,
+                        help=f'CTranslate2 CPU threads (default: {DEFAULT_CPU_THREADS})')
     parser.add_argument('--language', help='Language code or auto')
     parser.add_argument('--translate', action='store_true', help='Translate to English')
+    parser.add_argument('--word_timestamps', action='store_true',
+                        help='Return word-level timestamps (extra alignment pass per segment; off by default)')
+    parser.add_argument('--vad', choices=VAD_CHOICES, default='auto',
+                        help=f'Voice activity detection: on, off, or auto (skip for clips up to '
+                             f'{VAD_AUTO_MIN_DURATION_S:g}s)')
+    parser.add_argument('--min_silence_duration_ms', type=int, default=500,
+                        help='Minimum silence duration for VAD segmentation in ms')
+    parser.add_argument('--batch_size', type=int, default=1,
+                        help='Segments decoded per batch; values above 1 use BatchedInferencePipeline (GPU)')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for multiple --audio files on cpu, each with its own model '
+                             '(default: cpu count / cpu_threads)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write NDJSON: one {"segment": ...} line per decoded segment, then a {"summary": ...} line')
+    parser.add_argument('--oneshot', action='store_true',
+                        help='Transcribe --audio once and exit instead of serving requests from stdin')
     
     args = parser.parse_args()
-    
-    # Check if audio file exists
-    if not os.path.exists(args.audio):
-        print(json.dumps({"error": f"Audio file not found: {args.audio}"}))
+
+    # Multi-file results are keyed by path, so a repeated path would overwrite its first result
+    if args.audio:
+        duplicates = sorted({path for path in args.audio if args.audio.count(path) > 1})
+        if duplicates:
+            parser.error(f"duplicate --audio path: {', '.join(duplicates)}")
+
+    try:
+        import_dependencies()
+    except ImportError as e:
+        print(json.dumps({"error": str(e)}))
         sys.exit(1)
-    
-    # Perform transcription
-    result = transcribe_audio(
+
+    if not args.oneshot:
+        if args.audio:
+            parser.error('--audio requires --oneshot')
+        serve_loop(args)
+        return
+
+    if not args.audio:
+        parser.error('--oneshot requires --audio')
+
+    options = dict(
         model_path=args.model,
-        audio_path=args.audio,
         device=args.device,
         compute_type=args.compute_type,
         language=args.language,
-        translate=args.translate
+        translate=args.translate,
+        vad=args.vad,
+        min_silence_duration_ms=args.min_silence_duration_ms,
+        batch_size=args.batch_size,
+        cpu_threads=args.cpu_threads,
+        word_timestamps=args.word_timestamps
     )
+
+    if len(args.audio) > 1:
+        if args.stream:
+            parser.error('--stream supports a single --audio')
+        cpu_threads = args.cpu_threads or DEFAULT_CPU_THREADS
+        workers = args.workers or max(1, (os.cpu_count() or 1) // cpu_threads)
+        workers = min(workers, len(args.audio))
+        if args.device == "cpu" and workers > 1:
+            if not args.cpu_threads:
+                # Share the cores between the workers actually started
+                options["cpu_threads"] = max(1, (os.cpu_count() or 1) // workers)
+            results = transcribe_parallel(args.audio, workers, **options)
+        else:
+            results = transcribe_many(args.audio, **options)
+        print(dumps(results, indent=True))
+        return
+
+    audio_path = options["audio_path"] = args.audio[0]
+    
+    # Check if audio file exists
+    if not os.path.exists(audio_path):
+        print(json.dumps({"error": f"Audio file not found: {audio_path}"}))
+        sys.exit(1)
+
+    if args.stream:
+        stream_audio(**options)
+        return
+
+    # Perform transcription
+    result = transcribe_audio(**options)
     
     # Output JSON result
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(dumps(result, indent=True))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
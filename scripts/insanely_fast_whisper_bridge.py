@@ -8,23 +8,132 @@ import sys
 import json
 import argparse
 import os
+import functools
 import tempfile
 from pathlib import Path
 
 try:
-    import torch
-    from transformers import pipeline, AutoModelForSpeechSeq2Seq, AutoProcessor
-    import librosa
-    import numpy as np
+    import orjson
+
+    def dumps(obj, indent=False):
+        """Serialize obj to a JSON string (orjson when available)"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode()
 except ImportError:
-    print(json.dumps({
-        "error": "Required dependencies not installed. Run: pip install torch transformers librosa numpy"
-    }))
-    sys.exit(1)
+    def dumps(obj, indent=False):
+        """Serialize obj to a JSON string (orjson when available)"""
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+# Cap OpenMP/MKL threads before torch initializes its thread pools; oversized
+# pools contend across cores and slow down CPU inference
+DEFAULT_NUM_THREADS = min(8, os.cpu_count() or 1)
+os.environ.setdefault("OMP_NUM_THREADS", str(DEFAULT_NUM_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(DEFAULT_NUM_THREADS))
+
+# Heavy dependencies are imported on first use so --help and argument errors stay fast
+torch = None
+pipeline = AutoModelForSpeechSeq2Seq = AutoProcessor = BitsAndBytesConfig = None
+sf = soxr = np = None
+_IMPORTS_DONE = False
+
+def import_dependencies():
+    """
+    Import torch, transformers and the audio libraries into module globals once
+
+    Raises:
+        ImportError: If a required dependency is not installed
+    """
+    global torch, pipeline, AutoModelForSpeechSeq2Seq, AutoProcessor, BitsAndBytesConfig
+    global sf, soxr, np, _IMPORTS_DONE
+    if _IMPORTS_DONE:
+        return
+
+    try:
+        import torch
+        from transformers import pipeline, AutoModelForSpeechSeq2Seq, AutoProcessor, BitsAndBytesConfig
+        import soundfile as sf
+        import soxr
+        import numpy as np
+    except ImportError as e:
+        raise ImportError(
+            "Required dependencies not installed. Run: pip install torch transformers soundfile soxr numpy"
+        ) from e
+    _IMPORTS_DONE = True
+
+QUANTIZATION_CHOICES = ("none", "int8", "int4", "nf4")
+TORCH_DTYPE_CHOICES = ("auto", "float16", "float32", "bfloat16")
+
+@functools.lru_cache(maxsize=8)
+def resolve_device_dtype(device, torch_dtype):
+    """
+    Resolve 'auto' device/dtype values, probing CUDA at most once per combination
+
+    'auto' device picks cuda:0 when available, else cpu. 'auto' dtype is
+    float16 on an auto-selected GPU and float32 otherwise.
+
+    Returns:
+        tuple: (device string, torch.dtype)
+
+    Raises:
+        ValueError: If torch_dtype is not one of TORCH_DTYPE_CHOICES
+    """
+    if torch_dtype not in TORCH_DTYPE_CHOICES:
+        raise ValueError(f"Invalid torch_dtype '{torch_dtype}', expected one of: {', '.join(TORCH_DTYPE_CHOICES)}")
+
+    default_dtype = torch.float32
+    if device == "auto":
+        if torch.cuda.is_available():
+            device = "cuda:0"
+            default_dtype = torch.float16
+        else:
+            device = "cpu"
+
+    return device, default_dtype if torch_dtype == "auto" else getattr(torch, torch_dtype)
+
+def build_quantization_config(quantization):
+    """
+    Build the bitsandbytes weight-only quantization config, or None for 'none'
+    """
+    if quantization == "int8":
+        return BitsAndBytesConfig(load_in_8bit=True)
+    if quantization in ("int4", "nf4"):
+        return BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4" if quantization == "nf4" else "fp4",
+            bnb_4bit_compute_dtype=torch.float16
+        )
+    return None
+
+def load_audio(audio_path, sample_rate=16000):
+    """
+    Load audio as mono float32 at sample_rate
+
+    Reads through libsndfile and resamples with soxr. Formats libsndfile
+    cannot decode (e.g. mp3 on older builds) fall back to librosa.
+    """
+    try:
+        audio, sr = sf.read(audio_path, dtype='float32')
+    except sf.LibsndfileError as e:
+        try:
+            import librosa
+        except ImportError:
+            raise RuntimeError(f"libsndfile cannot decode {audio_path} ({e}); "
+                               "install librosa for fallback decoding: pip install librosa") from e
+        audio, _ = librosa.load(audio_path, sr=sample_rate)
+        return audio, sample_rate
+
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if sr != sample_rate:
+        audio = soxr.resample(audio, sr, sample_rate)
+    return audio, sample_rate
 
 def transcribe_audio(model_path, audio_path, device="auto", torch_dtype="auto", 
                     language=None, translate=False, batch_size=24, chunk_length_s=30,
-                    return_timestamps=True):
+                    return_timestamps=True, quantization="none", num_threads=None,
+                    compile_model=False, emit_chunks=False, static_cache=False):
     """
     Transcribe audio using insanely-fast-whisper (transformers pipeline)
     
@@ -38,47 +147,89 @@ def transcribe_audio(model_path, audio_path, device="auto", torch_dtype="auto",
         batch_size: Batch size for processing
         chunk_length_s: Chunk length in seconds
         return_timestamps: Whether to return word-level timestamps
+        quantization: 'none', 'int8', 'int4' or 'nf4' bitsandbytes weight-only
+            quantization (CUDA only)
+        num_threads: Intra-op thread count for CPU inference (default: min(8, cpu count))
+        compile_model: Compile the model forward with torch.compile (CUDA only,
+            implies static_cache)
+        emit_chunks: Include the raw pipeline chunks in the result
+        static_cache: Use a fixed-size (static) decoder KV cache
     
     Returns:
         dict: Transcription result with text and metadata
     """
     try:
+        import_dependencies()
+
         # Determine device
-        if device == "auto":
-            if torch.cuda.is_available():
-                device = "cuda:0"
-                torch_dtype = torch.float16 if torch_dtype == "auto" else getattr(torch, torch_dtype)
-            else:
-                device = "cpu"
-                torch_dtype = torch.float32 if torch_dtype == "auto" else getattr(torch, torch_dtype)
-        else:
-            torch_dtype = torch.float32 if torch_dtype == "auto" else getattr(torch, torch_dtype)
-
-        # Load model and processor
-        model = AutoModelForSpeechSeq2Seq.from_pretrained(
-            model_path, 
-            torch_dtype=torch_dtype, 
-            low_cpu_mem_usage=True, 
-            use_safetensors=True
-        )
-        model.to(device)
-        
-        processor = AutoProcessor.from_pretrained(model_path)
+        device, torch_dtype = resolve_device_dtype(device, torch_dtype)
 
-        # Create pipeline
-        pipe = pipeline(
-            "automatic-speech-recognition",
-            model=model,
-            tokenizer=processor.tokenizer,
-            feature_extractor=processor.feature_extractor,
+        if device == "cpu":
+            torch.set_num_threads(num_threads or DEFAULT_NUM_THREADS)
+
+        quantization_config = build_quantization_config(quantization)
+        if quantization_config is not None:
+            if not str(device).startswith("cuda"):
+                return {"error": f"Quantization '{quantization}' requires a CUDA device, got '{device}'"}
+            # bitsandbytes kernels compute in float16
+            torch_dtype = torch.float16
+
+        # torch.compile only pays off with CUDA graphs and does not support bitsandbytes layers
+        compile_model = compile_model and str(device).startswith("cuda") and quantization_config is None
+
+        pipeline_options = dict(
             max_new_tokens=128,
             chunk_length_s=chunk_length_s,
             batch_size=batch_size,
             return_timestamps=return_timestamps,
             torch_dtype=torch_dtype,
-            device=device,
         )
 
+        # Create pipeline
+        if quantization_config is not None:
+            # bitsandbytes places the quantized weights itself; the model cannot be moved afterwards
+            model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                model_path,
+                torch_dtype=torch_dtype,
+                low_cpu_mem_usage=True,
+                use_safetensors=True,
+                attn_implementation="sdpa",
+                quantization_config=quantization_config,
+                device_map=device
+            )
+            processor = AutoProcessor.from_pretrained(model_path)
+            pipe = pipeline(
+                "automatic-speech-recognition",
+                model=model,
+                tokenizer=processor.tokenizer,
+                feature_extractor=processor.feature_extractor,
+                **pipeline_options
+            )
+        else:
+            # Let the pipeline load model, tokenizer and feature extractor from the path once
+            pipe = pipeline(
+                "automatic-speech-recognition",
+                model=model_path,
+                device=device,
+                model_kwargs={
+                    "low_cpu_mem_usage": True,
+                    "use_safetensors": True,
+                    "attn_implementation": "sdpa"
+                },
+                **pipeline_options
+            )
+            model = pipe.model
+
+        # Static KV cache keeps decoder shapes fixed, which torch.compile needs to
+        # capture CUDA graphs; 448 is Whisper's maximum decoder length
+        if static_cache or compile_model:
+            model.generation_config.cache_implementation = "static"
+            model.generation_config.max_length = 448
+
+        # mode="default" has been seen to regress for Whisper; reduce-overhead captures CUDA graphs
+        if compile_model:
+            model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=True)
+
         # Set generation parameters
         generate_kwargs = {
             "task": "translate" if translate else "transcribe",
@@ -86,10 +237,11 @@ def transcribe_audio(model_path, audio_path, device="auto", torch_dtype="auto",
         }
 
         # Load and process audio
-        audio_data, sample_rate = librosa.load(audio_path, sr=16000)
+        audio_data, sample_rate = load_audio(audio_path)
         
         # Run transcription
-        result = pipe(audio_data, generate_kwargs=generate_kwargs)
+        with torch.inference_mode():
+            result = pipe(audio_data, generate_kwargs=generate_kwargs)
         
         # Extract information
         text = result["text"].strip()
@@ -105,17 +257,21 @@ def transcribe_audio(model_path, audio_path, device="auto", torch_dtype="auto",
                     chunk_words = chunk["text"].strip().split()
                     if chunk_words and start_time is not None and end_time is not None:
                         duration = end_time - start_time if end_time else 0
-                        word_duration = duration / len(chunk_words) if chunk_words else 0
-                        
-                        for i, word in enumerate(chunk_words):
-                            word_start = start_time + (i * word_duration)
-                            word_end = word_start + word_duration
-                            words.append({
+                        word_duration = duration / len(chunk_words)
+
+                        # Spread the chunk duration evenly over its words in one vectorized pass
+                        starts = start_time + np.arange(len(chunk_words)) * word_duration
+                        ends = np.round(starts + word_duration, 2).tolist()
+                        starts = np.round(starts, 2).tolist()
+                        words.extend(
+                            {
                                 "word": word,
-                                "start": round(word_start, 2),
-                                "end": round(word_end, 2),
+                                "start": word_start,
+                                "end": word_end,
                                 "probability": 0.95  # Approximate confidence
-                            })
+                            }
+                            for word, word_start, word_end in zip(chunk_words, starts, ends)
+                        )
 
         # Calculate duration
         duration = len(audio_data) / sample_rate
@@ -123,14 +279,17 @@ def transcribe_audio(model_path, audio_path, device="auto", torch_dtype="auto",
         # Detect language if not specified
         detected_language = language if language and language != 'auto' else 'pt'
         
-        return {
+        result_out = {
             "text": text,
             "language": detected_language,
             "language_probability": 0.95,  # Approximate confidence
             "duration": duration,
-            "words": words,
-            "chunks": chunks
+            "words": words
         }
+        # Chunks duplicate the data already in words, so only return them on request
+        if emit_chunks:
+            result_out["chunks"] = chunks
+        return result_out
         
     except Exception as e:
         return {"error": str(e)}
@@ -140,14 +299,31 @@ def main():
     parser.add_argument('--model', required=True, help='Model name or path')
     parser.add_argument('--audio', required=True, help='Audio file path')
     parser.add_argument('--device', default='auto', help='Device: auto, cpu, cuda, or specific device')
-    parser.add_argument('--torch_dtype', default='auto', help='Torch dtype: auto, float16, float32, bfloat16')
+    parser.add_argument('--torch_dtype', choices=TORCH_DTYPE_CHOICES, default='auto',
+                        help='Torch dtype: auto, float16, float32, bfloat16')
     parser.add_argument('--language', help='Language code or auto')
     parser.add_argument('--translate', action='store_true', help='Translate to English')
     parser.add_argument('--batch_size', type=int, default=24, help='Batch size')
     parser.add_argument('--chunk_length_s', type=int, default=30, help='Chunk length in seconds')
     parser.add_argument('--return_timestamps', action='store_true', default=True, help='Return timestamps')
+    parser.add_argument('--quantization', choices=QUANTIZATION_CHOICES, default='none',
+                        help='Weight-only bitsandbytes quantization (CUDA only): none, int8, int4 or nf4')
+    parser.add_argument('--compile', action='store_true',
+                        help='Compile the model with torch.compile (reduce-overhead, CUDA only, not with quantization)')
+    parser.add_argument('--static_cache', action='store_true',
+                        help='Use a static decoder KV cache (implied by --compile)')
+    parser.add_argument('--emit_chunks', action='store_true',
+                        help='Include the raw pipeline chunks in the output (omitted by default)')
+    parser.add_argument('--num_threads', type=int,
+                        help=f'Threads for CPU inference (default: {DEFAULT_NUM_THREADS})')
     
     args = parser.parse_args()
+
+    try:
+        import_dependencies()
+    except ImportError as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
     
     # Check if audio file exists
     if not os.path.exists(args.audio):
@@ -164,11 +340,16 @@ def main():
         translate=args.translate,
         batch_size=args.batch_size,
         chunk_length_s=args.chunk_length_s,
-        return_timestamps=args.return_timestamps
+        return_timestamps=args.return_timestamps,
+        quantization=args.quantization,
+        num_threads=args.num_threads,
+        compile_model=args.compile,
+        emit_chunks=args.emit_chunks,
+        static_cache=args.static_cache
     )
     
     # Output JSON result
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(dumps(result, indent=True))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -141,7 +141,7 @@ install_transformers() {
     done
     
     # Audio processing dependencies
-    for package in "librosa" "soundfile" "audioread"; do
+    for package in "librosa" "soundfile" "soxr" "audioread"; do
         if ! pip install "$package"; then
             print_error "Failed to install $package"
             return 1
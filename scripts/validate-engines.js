@@ -30,7 +30,7 @@ function validateEnvironmentConfig() {
   
   if (whisperEngine === 'faster-whisper') {
     const device = process.env.FASTER_WHISPER_DEVICE || 'cpu';
-    const computeType = process.env.FASTER_WHISPER_COMPUTE_TYPE || 'int8';
+    const computeType = process.env.FASTER_WHISPER_COMPUTE_TYPE || 'auto';
     log('cyan', `faster-whisper device: ${device}`);
     log('cyan', `faster-whisper compute_type: ${computeType}`);
   }
@@ -64,7 +64,10 @@ class QueueManager {
       workerScript = '../workers/transcriptionWorker.js';
     }
     
-    const worker = new Worker(path.join(__dirname, workerScript));
+    // Engines that size their own thread pools split the cores by this count
+    const worker = new Worker(path.join(__dirname, workerScript), {
+      workerData: { workerCount: this.maxWorkers }
+    });
     
     worker.on('message', (message) => {
       const { type, jobId, result, error, processingTime } = message;
@@ -266,6 +269,7 @@ class QueueManager {
         if (recommendedWorkers > this.maxWorkers) {
           // Adicionar workers
           const workersToAdd = recommendedWorkers - this.maxWorkers;
+          this.maxWorkers = recommendedWorkers;
           for (let i = 0; i < workersToAdd; i++) {
             this.createWorker();
           }
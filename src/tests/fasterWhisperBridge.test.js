@@ -0,0 +1,104 @@
+const { spawnSync } = require('child_process');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const BRIDGE = path.join(__dirname, '../../scripts/faster_whisper_bridge.py');
+
+// Stub faster_whisper package whose model always fails to load
+const FAILING_STUB = `
+class WhisperModel:
+    def __init__(self, *args, **kwargs):
+        raise RuntimeError("model load failed")
+
+def decode_audio(path, sampling_rate=16000):
+    return [0.0] * sampling_rate
+`;
+
+describe('faster_whisper_bridge.py', () => {
+  let stubDir;
+  let audioFiles;
+
+  beforeAll(() => {
+    stubDir = fs.mkdtempSync(path.join(os.tmpdir(), 'fw-stub-'));
+    fs.mkdirSync(path.join(stubDir, 'faster_whisper'));
+    fs.writeFileSync(path.join(stubDir, 'faster_whisper', '__init__.py'), FAILING_STUB);
+
+    audioFiles = ['a.wav', 'b.wav'].map((name) => {
+      const filePath = path.join(stubDir, name);
+      fs.writeFileSync(filePath, '');
+      return filePath;
+    });
+  });
+
+  afterAll(() => {
+    fs.rmSync(stubDir, { recursive: true, force: true });
+  });
+
+  const runBridge = (args, input) => spawnSync('python3', [BRIDGE, '--model', 'stub', ...args], {
+    env: { ...process.env, PYTHONPATH: stubDir },
+    input,
+    encoding: 'utf8',
+    timeout: 60000
+  });
+
+  test('should report a failing model load per file when using worker processes', () => {
+    const result = runBridge([
+      '--oneshot',
+      '--audio', audioFiles[0],
+      '--audio', audioFiles[1],
+      '--device', 'cpu',
+      '--workers', '2',
+      '--cpu_threads', '1'
+    ]);
+
+    expect(result.error).toBeUndefined();
+    expect(result.status).toBe(0);
+
+    const output = JSON.parse(result.stdout);
+    audioFiles.forEach((filePath) => {
+      expect(output[filePath].error).toBe('model load failed');
+    });
+  }, 60000);
+
+  test('should keep serving after requests that are not JSON objects', () => {
+    const result = runBridge([], ['[]', '"x"', '1', JSON.stringify({ audio: audioFiles[0], id: 7 })].join('\n') + '\n');
+
+    expect(result.error).toBeUndefined();
+    expect(result.status).toBe(0);
+
+    const lines = result.stdout.trim().split('\n').map((line) => JSON.parse(line));
+    expect(lines.length).toBe(4);
+    lines.slice(0, 3).forEach((line) => {
+      expect(line.error).toBe('Invalid request: expected a JSON object');
+    });
+    expect(lines[3]).toEqual({ error: 'model load failed', id: 7 });
+  }, 60000);
+
+  test('should answer requests with an invalid audio field and keep serving', () => {
+    const requests = [
+      { audio: ['x'], id: 1 },
+      { audio: 1, id: 2 },
+      { audio: '', id: 3 },
+      { audio: audioFiles[0], id: 4 }
+    ];
+    const result = runBridge([], requests.map((request) => JSON.stringify(request)).join('\n') + '\n');
+
+    expect(result.error).toBeUndefined();
+    expect(result.status).toBe(0);
+
+    const lines = result.stdout.trim().split('\n').map((line) => JSON.parse(line));
+    expect(lines.length).toBe(4);
+    lines.slice(0, 3).forEach((line, index) => {
+      expect(line).toEqual({ error: 'Invalid request: "audio" must be a non-empty string', id: index + 1 });
+    });
+    expect(lines[3]).toEqual({ error: 'model load failed', id: 4 });
+  }, 60000);
+
+  test('should reject repeated --audio paths', () => {
+    const result = runBridge(['--oneshot', '--audio', audioFiles[0], '--audio', audioFiles[0]]);
+
+    expect(result.status).toBe(2);
+    expect(result.stderr).toContain(`duplicate --audio path: ${audioFiles[0]}`);
+  }, 60000);
+});
@@ -1,12 +1,16 @@
-const { parentPort } = require('worker_threads');
+const { parentPort, workerData } = require('worker_threads');
 const { spawn } = require('child_process');
 const fs = require('fs');
+const os = require('os');
 const path = require('path');
 const FFmpegValidator = require('../utils/ffmpegValidator');
 
 class FasterWhisperWorker {
   constructor() {
     this.ffmpegValidator = new FFmpegValidator();
+    this.bridgeProcess = null;
+    this.pendingRequests = new Map();
+    this.nextRequestId = 0;
     this.init();
   }
 
@@ -35,7 +39,10 @@ class FasterWhisperWorker {
 
       this.modelName = process.env.AUTO_DOWNLOAD_MODEL || 'large-v3-turbo';
       this.device = process.env.FASTER_WHISPER_DEVICE || 'cpu';
-      this.computeType = process.env.FASTER_WHISPER_COMPUTE_TYPE || 'int8';
+      this.computeType = process.env.FASTER_WHISPER_COMPUTE_TYPE || 'auto';
+      this.vad = process.env.FASTER_WHISPER_VAD || 'auto';
+      this.batchSize = parseInt(process.env.FASTER_WHISPER_BATCH_SIZE) || 1;
+      this.cpuThreads = parseInt(process.env.FASTER_WHISPER_CPU_THREADS) || this.defaultCpuThreads();
       this.pythonBridge = path.join(process.cwd(), 'scripts', 'faster_whisper_bridge.py');
       
       // Validate Python and faster-whisper installation
@@ -51,6 +58,13 @@ class FasterWhisperWorker {
     }
   }
 
+  defaultCpuThreads() {
+    // Every worker owns a bridge process, so split the cores across the
+    // workers the queue actually runs (passed in by QueueManager.createWorker)
+    const workerCount = (workerData && workerData.workerCount) || 1;
+    return Math.max(1, Math.floor(os.cpus().length / workerCount));
+  }
+
   async validatePythonSetup() {
     // Check if Python bridge script exists
     if (!fs.existsSync(this.pythonBridge)) {
@@ -106,25 +120,28 @@ class FasterWhisperWorker {
         convertedFilePath = await this.convertToWav(filePath);
       }
 
-      const args = [
-        this.pythonBridge,
-        '--model', this.modelName,
-        '--audio', convertedFilePath,
-        '--device', this.device,
-        '--compute_type', this.computeType
-      ];
+      const request = {
+        audio: convertedFilePath,
+        model: this.modelName,
+        device: this.device,
+        compute_type: this.computeType,
+        vad: this.vad,
+        batch_size: this.batchSize,
+        word_timestamps: options.wordTimestamps !== false,
+        cpu_threads: this.cpuThreads
+      };
 
       // Add language if specified
       if (options.language && options.language !== 'auto') {
-        args.push('--language', options.language);
+        request.language = options.language;
       }
 
       // Add translate option
       if (options.translate) {
-        args.push('--translate');
+        request.translate = true;
       }
 
-      const result = await this.runPythonCommand(args);
+      const result = await this.runBridgeRequest(request);
       const processingTime = Math.ceil((Date.now() - startTime) / 1000);
       
       return {
@@ -191,58 +208,108 @@ class FasterWhisperWorker {
     });
   }
 
-  runPythonCommand(args) {
-    return new Promise((resolve, reject) => {
-      const pythonPath = path.join(process.cwd(), 'venv', 'bin', 'python3');
-      const pythonCommand = fs.existsSync(pythonPath) ? pythonPath : 'python3';
-      const pythonProcess = spawn(pythonCommand, args);
-      let stdout = '';
-      let stderr = '';
+  startBridge() {
+    const pythonPath = path.join(process.cwd(), 'venv', 'bin', 'python3');
+    const pythonCommand = fs.existsSync(pythonPath) ? pythonPath : 'python3';
+    const bridgeProcess = spawn(pythonCommand, [
+      this.pythonBridge,
+      '--model', this.modelName,
+      '--device', this.device,
+      '--compute_type', this.computeType
+    ]);
+    let stdoutBuffer = '';
+    let stderr = '';
+
+    bridgeProcess.stdout.setEncoding('utf8');
+    bridgeProcess.stdout.on('data', (data) => {
+      stdoutBuffer += data;
+      let newlineIndex;
+      while ((newlineIndex = stdoutBuffer.indexOf('\n')) !== -1) {
+        const line = stdoutBuffer.slice(0, newlineIndex).trim();
+        stdoutBuffer = stdoutBuffer.slice(newlineIndex + 1);
+        if (line) {
+          this.handleBridgeLine(line, stderr);
+        }
+      }
+    });
 
-      pythonProcess.stdout.on('data', (data) => {
-        stdout += data.toString();
-      });
+    bridgeProcess.stderr.on('data', (data) => {
+      // Keep only the tail so a long-lived process doesn't accumulate logs
+      stderr = (stderr + data.toString()).slice(-4096);
+    });
 
-      pythonProcess.stderr.on('data', (data) => {
-        stderr += data.toString();
-      });
+    const failPending = (error) => {
+      if (this.bridgeProcess !== bridgeProcess) return;
+      this.bridgeProcess = null;
+      for (const { reject } of this.pendingRequests.values()) {
+        reject(error);
+      }
+      this.pendingRequests.clear();
+    };
 
-      pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-          reject(new Error(`Python process failed with code ${code}: ${stderr}`));
-          return;
-        }
+    bridgeProcess.on('close', (code) => {
+      failPending(new Error(`Python process exited with code ${code}: ${stderr}${stdoutBuffer}`));
+    });
 
-        try {
-          const result = JSON.parse(stdout);
-          
-          if (result.error) {
-            reject(new Error(result.error));
-            return;
-          }
-
-          console.log('[FasterWhisperWorker] Transcription result:', {
-            text_length: result.text ? result.text.length : 0,
-            language: result.language,
-            duration: result.duration,
-            words_count: result.words ? result.words.length : 0
-          });
-
-          // Validate that we actually got some transcription text
-          if (!result.text || result.text.length === 0) {
-            reject(new Error(`No transcription text extracted from faster-whisper. Raw output: ${stdout}`));
-            return;
-          }
-          
-          resolve(result);
-        } catch (parseError) {
-          reject(new Error(`Failed to parse faster-whisper output: ${parseError.message}. Raw output: ${stdout}. Stderr: ${stderr}`));
-        }
-      });
+    bridgeProcess.on('error', (error) => {
+      failPending(new Error(`Failed to start Python process: ${error.message}`));
+    });
 
-      pythonProcess.on('error', (error) => {
-        reject(new Error(`Failed to start Python process: ${error.message}`));
-      });
+    bridgeProcess.stdin.on('error', (error) => {
+      failPending(new Error(`Failed to write to Python process: ${error.message}`));
+    });
+
+    this.bridgeProcess = bridgeProcess;
+    console.log(`[FasterWhisperWorker] Started persistent Python bridge (pid ${bridgeProcess.pid})`);
+  }
+
+  handleBridgeLine(line, stderr) {
+    let result;
+    try {
+      result = JSON.parse(line);
+    } catch (parseError) {
+      console.warn(`[FasterWhisperWorker] Ignoring unparseable bridge output: ${line}`);
+      return;
+    }
+
+    const pending = this.pendingRequests.get(result.id);
+    if (!pending) {
+      console.warn('[FasterWhisperWorker] Received result for unknown request:', result.id);
+      return;
+    }
+    this.pendingRequests.delete(result.id);
+    const { resolve, reject } = pending;
+
+    if (result.error) {
+      reject(new Error(result.error));
+      return;
+    }
+
+    console.log('[FasterWhisperWorker] Transcription result:', {
+      text_length: result.text ? result.text.length : 0,
+      language: result.language,
+      duration: result.duration,
+      words_count: result.words ? result.words.length : 0
+    });
+
+    // Validate that we actually got some transcription text
+    if (!result.text || result.text.length === 0) {
+      reject(new Error(`No transcription text extracted from faster-whisper. Raw output: ${line}. Stderr: ${stderr}`));
+      return;
+    }
+
+    resolve(result);
+  }
+
+  runBridgeRequest(request) {
+    if (!this.bridgeProcess) {
+      this.startBridge();
+    }
+
+    return new Promise((resolve, reject) => {
+      const id = ++this.nextRequestId;
+      this.pendingRequests.set(id, { resolve, reject });
+      this.bridgeProcess.stdin.write(JSON.stringify({ ...request, id }) + '\n');
     });
   }
 
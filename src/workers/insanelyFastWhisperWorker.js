@@ -38,6 +38,11 @@ class InsanelyFastWhisperWorker {
       this.torchDtype = process.env.INSANELY_FAST_WHISPER_TORCH_DTYPE || 'auto';
       this.batchSize = parseInt(process.env.INSANELY_FAST_WHISPER_BATCH_SIZE) || 24;
       this.chunkLengthS = parseInt(process.env.INSANELY_FAST_WHISPER_CHUNK_LENGTH_S) || 30;
+      this.quantization = process.env.INSANELY_FAST_WHISPER_QUANTIZATION || 'none';
+      this.numThreads = parseInt(process.env.INSANELY_FAST_WHISPER_NUM_THREADS) || null;
+      this.compile = process.env.INSANELY_FAST_WHISPER_COMPILE === 'true';
+      this.staticCache = process.env.INSANELY_FAST_WHISPER_STATIC_CACHE === 'true';
+      this.emitChunks = process.env.INSANELY_FAST_WHISPER_EMIT_CHUNKS === 'true';
       this.pythonBridge = path.join(process.cwd(), 'scripts', 'insanely_fast_whisper_bridge.py');
       
       // Validate Python and dependencies installation
@@ -63,7 +68,7 @@ class InsanelyFastWhisperWorker {
     return new Promise((resolve, reject) => {
       const pythonPath = path.join(process.cwd(), 'venv', 'bin', 'python3');
       const pythonCommand = fs.existsSync(pythonPath) ? pythonPath : 'python3';
-      const pythonTest = spawn(pythonCommand, ['-c', 'import torch, transformers, librosa; print("OK")']);
+      const pythonTest = spawn(pythonCommand, ['-c', 'import torch, transformers, soundfile, soxr; print("OK")']);
       let stdout = '';
       let stderr = '';
 
@@ -77,7 +82,7 @@ class InsanelyFastWhisperWorker {
 
       pythonTest.on('close', (code) => {
         if (code !== 0) {
-          reject(new Error(`Python/dependencies validation failed: ${stderr.trim()}. Please install: pip install torch transformers librosa numpy`));
+          reject(new Error(`Python/dependencies validation failed: ${stderr.trim()}. Please install: pip install torch transformers soundfile soxr numpy (plus librosa for mp3 on older libsndfile builds)`));
           return;
         }
         
@@ -120,9 +125,30 @@ class InsanelyFastWhisperWorker {
         '--device', this.device,
         '--torch_dtype', this.torchDtype,
         '--batch_size', this.batchSize.toString(),
-        '--chunk_length_s', this.chunkLengthS.toString()
+        '--chunk_length_s', this.chunkLengthS.toString(),
+        '--quantization', this.quantization
       ];
 
+      // Add CPU thread cap if configured
+      if (this.numThreads) {
+        args.push('--num_threads', this.numThreads.toString());
+      }
+
+      // Add torch.compile option
+      if (this.compile) {
+        args.push('--compile');
+      }
+
+      // Add static KV cache option
+      if (this.staticCache) {
+        args.push('--static_cache');
+      }
+
+      // Add raw chunks to the output only when requested
+      if (this.emitChunks) {
+        args.push('--emit_chunks');
+      }
+
       // Add language if specified
       if (options.language && options.language !== 'auto') {
         args.push('--language', options.language);
@@ -154,7 +180,8 @@ class InsanelyFastWhisperWorker {
           model: this.modelName,
           device: this.device,
           batch_size: this.batchSize,
-          chunk_length_s: this.chunkLengthS
+          chunk_length_s: this.chunkLengthS,
+          quantization: this.quantization
         }
       };
     } catch (error) {